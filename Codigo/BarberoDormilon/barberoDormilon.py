@@ -4,14 +4,23 @@ import random
 import keyboard
 import queue # módulo queue para get y put, seguro de usar.
 import math   # para la desviación estándar (fairness)
+from collections import deque # ventana deslizante de rechazos (autoescalado)
 
 BARBEROS = 1 # monto de BARBEROS, se puede cambiar.
 CLIENTES = 50 # monto de CLIENTES, se puede cambiar.
 ASIENTOS = 5 # monto de ASIENTOS en la sala de espera, se puede cambiar.
 ESPERAS = 1 # usar múltiplo de random.random() para que CLIENTES lleguen.
 
-def espera(): # simula el arribo de CLIENTES a tiempo al azar.
-	time.sleep(ESPERAS * random.random())
+# ------------------ AUTOESCALADO ------------------
+AUTOESCALADO = False # True: un controlador ajusta los barberos entre BARBEROS_MIN y BARBEROS_MAX.
+BARBEROS_MIN = 1
+BARBEROS_MAX = 4
+VENTANA = 5.0 # segundos de la ventana deslizante de rechazos.
+UMBRAL_SUBIR = max(1, ASIENTOS - 1) # ocupación de sala_espera que hace entrar un barbero más (nunca 0, si no siempre subiría).
+INACTIVIDAD_BAJAR = 3.0 # segundos que un barbero debe dormir (sin rechazos en la ventana) para retirarse.
+ENFRIAMIENTO = 1.0 # segundos mínimos entre dos cambios del pool (histéresis, evita oscilar).
+PERIODO_CONTROL = 0.2 # cada cuánto revisa el controlador.
+COMPARAR_FIJOS = True # con AUTOESCALADO, también simula pools fijos de BARBEROS_MIN..BARBEROS_MAX con las mismas llegadas.
 
 # ------------------ MÉTRICAS ------------------
 t0 = time.perf_counter()     # inicio de la simulación
@@ -26,6 +35,12 @@ fair_M2 = 0.0
 # Overhead de sincronización = tiempo total que el barbero pasa bloqueado en Condition.wait()
 sync_overhead = 0.0
 
+# Autoescalado: rechazos, esperas individuales (el p99 sí necesita la lista) y barbero-segundos usados
+rejected_count = 0
+rechazos_recientes = deque() # timestamps de rechazos, el controlador descarta los más viejos que VENTANA
+esperas = []
+barber_seconds = 0.0
+
 metrics_lock = threading.Lock()  # proteger acumuladores (cambios mínimos)
 
 class Barbero(threading.Thread):
@@ -35,20 +50,40 @@ class Barbero(threading.Thread):
 	def __init__(self, ID):
 		super().__init__()
 		self.ID = ID	# ID del barbero en caso de agregar más de 1.
+		self.retirar = False # el controlador lo marca para que se retire cuando no haya clientes.
+		self.durmiendo_desde = None # momento en que se durmió (None si está trabajando).
 
 	def run(self):
+		global barber_seconds
+		t_inicio = time.perf_counter()
+		try:
+			self.atender()
+		finally:
+			with metrics_lock:
+				barber_seconds += time.perf_counter() - t_inicio
+
+	def atender(self):
 		global served_count, total_wait_time, fair_n, fair_mean, fair_M2, sync_overhead
 		while True:
 			try:	# usar try/except es mejor que revisar tamaño de queue; queue.qsize() no es seguro con hilos.
 				cliente_actual = sala_espera.get(block=False) # no bloquear al tomar de la queue.
 			except queue.Empty: # se lanza cuando no hay clientes en la sala_espera.
-				if self.alto_completo.is_set(): # alto_completo se activa sólo cuando CLIENTES han sido atendidos completamente.
-					return
-				print(f"El barbero {self.ID} está durmiendo... Zzz... Zzz... ")
 				# medir overhead de sincronización (tiempo bloqueado en wait)
 				tw0 = time.perf_counter()
 				with self.condicion:
+					# se revisa con la condición tomada: quien hace set()/notify necesita este lock,
+					# así que el aviso no puede perderse entre la revisión y el wait().
+					if self.alto_completo.is_set(): # alto_completo se activa sólo cuando CLIENTES han sido atendidos completamente.
+						return
+					if self.retirar: # retiro ordenado: sólo con la sala vacía, nunca a mitad de un corte.
+						print(f"El barbero {self.ID} se retira por falta de clientes.")
+						return
+					if not sala_espera.empty(): # llegó un cliente justo después del get(); su notify aún no ocurrió.
+						continue
+					print(f"El barbero {self.ID} está durmiendo... Zzz... Zzz... ")
+					self.durmiendo_desde = tw0
 					self.condicion.wait() # duerme y espera para que el cliente lo despierte.
+					self.durmiendo_desde = None
 				tw1 = time.perf_counter()
 				with metrics_lock:
 					sync_overhead += (tw1 - tw0)
@@ -57,6 +92,7 @@ class Barbero(threading.Thread):
 				wait = time.perf_counter() - cliente_actual.t_llegada
 				with metrics_lock:
 					total_wait_time += wait
+					esperas.append(wait)
 					# actualizar fairness (desv. estándar) con Welford
 					fair_n += 1
 					delta = wait - fair_mean
@@ -70,15 +106,61 @@ class Barbero(threading.Thread):
 				with metrics_lock:
 					served_count += 1
 
+class Controlador(threading.Thread):
+	"""Agrega o retira barberos según la ocupación de sala_espera y los rechazos recientes."""
+
+	def __init__(self, barberos):
+		super().__init__()
+		self.barberos = barberos # lista compartida con simular() para poder hacer join al final.
+		self.siguiente_id = len(barberos)
+		self.ultimo_cambio = time.perf_counter()
+
+	def activos(self):
+		return [b for b in self.barberos if b.is_alive() and not b.retirar]
+
+	def run(self):
+		while not Barbero.alto_completo.wait(PERIODO_CONTROL):
+			ahora = time.perf_counter()
+			with metrics_lock:
+				while rechazos_recientes and ahora - rechazos_recientes[0] > VENTANA:
+					rechazos_recientes.popleft()
+				rechazos_en_ventana = len(rechazos_recientes)
+				rechazos_nuevos = sum(1 for t in rechazos_recientes if t > self.ultimo_cambio)
+			ocupacion = sala_espera.qsize() # aproximado, suficiente para decidir.
+			activos = self.activos()
+			if ahora - self.ultimo_cambio < ENFRIAMIENTO:
+				continue
+
+			# subir: sala casi llena o rechazos posteriores al último cambio (los anteriores ya se atendieron subiendo).
+			if (ocupacion >= UMBRAL_SUBIR or rechazos_nuevos > 0) and len(activos) < BARBEROS_MAX:
+				barbero = Barbero(self.siguiente_id)
+				self.siguiente_id += 1
+				self.barberos.append(barbero)
+				barbero.start()
+				self.ultimo_cambio = ahora
+				print(f"[controlador] sala={ocupacion}, rechazos={rechazos_nuevos}: entra el barbero {barbero.ID} ({len(activos) + 1} activos)")
+
+			# bajar: sala vacía, sin rechazos en toda la ventana y un barbero dormido hace rato.
+			elif ocupacion == 0 and rechazos_en_ventana == 0 and len(activos) > BARBEROS_MIN:
+				with Barbero.condicion:
+					ociosos = [b for b in activos if b.durmiendo_desde is not None and ahora - b.durmiendo_desde >= INACTIVIDAD_BAJAR]
+					if not ociosos:
+						continue
+					ociosos[0].retirar = True
+					Barbero.condicion.notify_all() # el marcado despierta y se retira; los demás vuelven a dormir.
+				self.ultimo_cambio = ahora
+				print(f"[controlador] barberos ociosos: se retira el barbero {ociosos[0].ID} ({len(activos) - 1} activos)")
+
 class Cliente(threading.Thread):
 	DURACION_CORTE = 5
 
-	def __init__(self, ID):
+	def __init__(self, ID, duracion=None):
 		super().__init__()
 		self.ID = ID
+		self.duracion = duracion # duración fija del corte (para comparar corridas con las mismas llegadas).
 
 	def corte(self): # simula el corte de cabello.
-		time.sleep(self.DURACION_CORTE * random.random())
+		time.sleep(self.duracion if self.duracion is not None else self.DURACION_CORTE * random.random())
 
 	def cortar(self, id_barbero):  # llamado desde el hilo Barbero.
 		print(f"El barbero {id_barbero} está cortando el cabello del cliente {self.ID}")
@@ -87,6 +169,7 @@ class Cliente(threading.Thread):
 		self.atendido.set() # "set" atendido para que el cliente deje la barbería.
 
 	def run(self):
+		global rejected_count
 		self.atendido = threading.Event()
 		self.t_llegada = time.perf_counter()  # timestamp de llegada (para la métrica de espera)
 
@@ -94,6 +177,9 @@ class Cliente(threading.Thread):
 			sala_espera.put(self, block=False)
 		except queue.Full: # sin espacio en sala_espera se va.
 			print(f"La sala de espera está llena, {self.ID} se fue...")
+			with metrics_lock:
+				rejected_count += 1
+				rechazos_recientes.append(self.t_llegada)
 			return
 
 		print(f"El cliente {self.ID} se sentó en la sala de espera.")
@@ -103,17 +189,30 @@ class Cliente(threading.Thread):
 		self.atendido.wait() # espera a ser atendido y luego se retira.
 
 
-if __name__ == "__main__":
+def simular(barberos, autoescalado, llegadas, duraciones):
+	"""Corre una simulación completa y devuelve sus métricas; reinicia el estado global."""
+	global t0, served_count, total_wait_time, fair_n, fair_mean, fair_M2, sync_overhead
+	global rejected_count, esperas, barber_seconds, sala_espera
+	t0 = time.perf_counter()
+	served_count, total_wait_time, sync_overhead = 0, 0.0, 0.0
+	fair_n, fair_mean, fair_M2 = 0, 0.0, 0.0
+	rejected_count, esperas, barber_seconds = 0, [], 0.0
+	rechazos_recientes.clear()
+	Barbero.alto_completo = threading.Event()
+
 	TODOS_CLIENTES = []          # lista de todos CLIENTES a atender.
 	sala_espera = queue.Queue(ASIENTOS) # tamaño máximo de ASIENTOS.
 
-	for i in range(BARBEROS): # crea el/los hilos barbero.
-		hilo_barbero = Barbero(i)
+	TODOS_BARBEROS = [Barbero(i) for i in range(barberos)]
+	for hilo_barbero in TODOS_BARBEROS: # crea el/los hilos barbero.
 		hilo_barbero.start()
+	if autoescalado:
+		controlador = Controlador(TODOS_BARBEROS)
+		controlador.start()
 
 	for i in range(CLIENTES): # crea el hilo cliente (llegadas aleatorias).
-		espera()
-		cliente = Cliente(i)
+		time.sleep(llegadas[i])
+		cliente = Cliente(i, duraciones[i])
 		TODOS_CLIENTES.append(cliente)
 		cliente.start()
 
@@ -122,23 +221,58 @@ if __name__ == "__main__":
 
 	time.sleep(0.1) # darle tiempo suficiente al barbero para limpiar tras el último cliente.
 	Barbero.alto_completo.set() # permite finalizar el trabajo del/los barbero(s).
+	if autoescalado:
+		controlador.join() # ya no agrega barberos después de esto.
 	with Barbero.condicion:
 		Barbero.condicion.notify_all() # despierta en caso de que alguno esté dormido para terminar.
-	
-	# ------------------ IMPRESIÓN DE MÉTRICAS ------------------
+	for hilo_barbero in TODOS_BARBEROS:
+		hilo_barbero.join() # para contabilizar sus barbero-segundos.
+
 	T = time.perf_counter() - t0
 	with metrics_lock:
 		atendidos = served_count
-		avg_wait = (total_wait_time / atendidos) if atendidos > 0 else 0.0
-		fairness = math.sqrt(fair_M2 / fair_n) if fair_n > 1 else 0.0
-		overhead_sync = sync_overhead
-	throughput = (atendidos / T) if T > 0 else 0.0
+		ordenadas = sorted(esperas)
+		return {
+			"throughput": (atendidos / T) if T > 0 else 0.0,
+			"avg_wait": (total_wait_time / atendidos) if atendidos > 0 else 0.0,
+			"p99_wait": ordenadas[max(0, math.ceil(0.99 * len(ordenadas)) - 1)] if ordenadas else 0.0,
+			"fairness": math.sqrt(fair_M2 / fair_n) if fair_n > 1 else 0.0,
+			"overhead_sync": sync_overhead,
+			"rechazados": rejected_count,
+			"barber_seconds": barber_seconds,
+		}
+
+
+if __name__ == "__main__":
+	# simula el arribo de CLIENTES a tiempo al azar; mismas llegadas y duraciones para todas las corridas.
+	llegadas = [ESPERAS * random.random() for _ in range(CLIENTES)]
+	duraciones = [Cliente.DURACION_CORTE * random.random() for _ in range(CLIENTES)]
+
+	corridas = {}
+	if AUTOESCALADO:
+		corridas[f"auto {BARBEROS_MIN}-{BARBEROS_MAX}"] = simular(BARBEROS_MIN, True, llegadas, duraciones)
+		if COMPARAR_FIJOS:
+			for n in range(BARBEROS_MIN, BARBEROS_MAX + 1):
+				corridas[f"fijo {n}"] = simular(n, False, llegadas, duraciones)
+	else:
+		corridas[f"fijo {BARBEROS}"] = simular(BARBEROS, False, llegadas, duraciones)
+
+	# ------------------ IMPRESIÓN DE MÉTRICAS ------------------
+	for nombre, m in corridas.items():
+		print(f"\n=== MÉTRICAS ({nombre}) ===")
+		print(f"throughput: {m['throughput']:.3f} clientes/seg")
+		print(f"tiempo de espera por recurso: {m['avg_wait']:.3f} s")
+		print(f"fairness: {m['fairness']:.3f} s (desviación estándar de esperas)")
+		print(f"overhead de sincronización: {m['overhead_sync']:.3f} s")
+		print(f"clientes rechazados: {m['rechazados']}")
+		print(f"p99 de espera: {m['p99_wait']:.3f} s")
+		print(f"barbero-segundos usados: {m['barber_seconds']:.3f} s")
 
-	print("\n=== MÉTRICAS ===")
-	print(f"throughput: {throughput:.3f} clientes/seg")
-	print(f"tiempo de espera por recurso: {avg_wait:.3f} s")
-	print(f"fairness: {fairness:.3f} s (desviación estándar de esperas)")
-	print(f"overhead de sincronización: {overhead_sync:.3f} s")
+	if len(corridas) > 1:
+		print("\n=== COMPARACIÓN ===")
+		print(f"{'pool':<10} {'rechazados':>10} {'p99 espera (s)':>15} {'barbero-seg':>12}")
+		for nombre, m in corridas.items():
+			print(f"{nombre:<10} {m['rechazados']:>10} {m['p99_wait']:>15.3f} {m['barber_seconds']:>12.3f}")
 
 	# Breve explicación de cada métrica en este contexto:
 	print("\nNotas:")
@@ -146,6 +280,9 @@ if __name__ == "__main__":
 	print("- tiempo de espera por recurso: tiempo promedio que un cliente esperó desde que llegó hasta que el barbero lo tomó.")
 	print("- fairness: qué tan parecidos fueron los tiempos de espera entre clientes (desviación estándar: menor = más equitativo).")
 	print("- overhead de sincronización: tiempo total que el barbero pasó bloqueado en Condition.wait() (durmiendo por falta de trabajo).")
+	print("- clientes rechazados: clientes que encontraron la sala de espera llena y se fueron.")
+	print("- p99 de espera: el 99% de los clientes atendidos esperó a lo más este tiempo.")
+	print("- barbero-segundos usados: suma del tiempo que cada barbero estuvo en servicio (costo del pool).")
 
 	print("\nLa Barbería está cerrada.")
 	keyboard.wait("esc")
@@ -0,0 +1,447 @@
+#!/usr/bin/env python3
+"""
+Benchmark de escalamiento multinúcleo con secciones críticas CPU-bound.
+
+En las simulaciones originales todo el "trabajo" es time.sleep, que libera el GIL,
+así que no dicen nada sobre cómo escalan los diseños con trabajo real de CPU.
+Aquí se repiten los tres escenarios con trabajo de CPU configurable:
+
+  - productor-consumidor: monitor con un Lock y dos Conditions (como
+    MonitorProductorConsumidor), n productores y n consumidores.
+  - barbero: n barberos toman clientes de sala_espera y actualizan las
+    métricas bajo metrics_lock.
+  - lectores-escritores: protocolo FIFO con sem_turno, mutex y sem_escritura,
+    n hilos/procesos que leen (compartido) y escriben (exclusivo).
+
+Cada escenario se corre con hilos (con GIL), con hilos en un intérprete
+free-threaded si hay uno disponible y con procesos. El trabajo total es fijo y
+se reparte entre n trabajadores (strong scaling), así que speedup = T(1) / T(n).
+También se reporta qué porcentaje del tiempo de los trabajadores se fue esperando
+la primitiva que serializa cada escenario.
+
+Ejecutar: python3 escalamiento_cpu.py [--max-nucleos 8] [--trabajo-dentro 2000]
+"""
+
+import argparse
+import json
+import multiprocessing
+import os
+import queue
+import shutil
+import subprocess
+import sys
+import threading
+import time
+
+# -----------------------
+# Configuración por defecto
+# -----------------------
+ITEMS = 2000             # unidades de trabajo totales por escenario (se reparten entre n)
+TRABAJO_FUERA = 20000    # iteraciones de CPU fuera de la sección crítica
+TRABAJO_DENTRO = 2000    # iteraciones de CPU dentro de la sección crítica
+ASIENTOS = 5             # tamaño de sala_espera del barbero
+TAMANO_BUFFER = 10       # tamaño del buffer del monitor
+ESCRITURA_CADA = 10      # 1 de cada ESCRITURA_CADA operaciones es escritura
+
+ESCENARIOS = ("productor-consumidor", "barbero", "lectores-escritores")
+PRIMITIVA = {
+    "productor-consumidor": "MonitorProductorConsumidor (lock y sus dos Conditions)",
+    "barbero": "metrics_lock",
+    "lectores-escritores": "sem_escritura (con sem_turno y mutex)",
+}
+
+# intérpretes free-threaded que se buscan en el PATH (o PYTHON_FREETHREADED)
+INTERPRETES_SIN_GIL = ("python3.14t", "python3.13t")
+
+
+def trabajo_cpu(iteraciones):
+    """Trabajo puramente de CPU (no libera el GIL)."""
+    acumulado = 0
+    for i in range(iteraciones):
+        acumulado = (acumulado + i * i) % 1000003
+    return acumulado
+
+
+def gil_activo():
+    return getattr(sys, "_is_gil_enabled", lambda: True)()
+
+
+def reparto(total, n):
+    """Reparte 'total' unidades entre n trabajadores lo más parejo posible."""
+    base, resto = divmod(total, n)
+    return [base + (1 if i < resto else 0) for i in range(n)]
+
+
+# -----------------------
+# Backends: mismas primitivas con hilos o con procesos
+# -----------------------
+class BackendHilos:
+    def __init__(self):
+        self.nombre = "hilos-GIL" if gil_activo() else "hilos-sin-GIL"
+        self.Lock = threading.Lock
+        self.Semaphore = threading.Semaphore
+        self.Condition = threading.Condition
+        self.Barrier = threading.Barrier
+
+    def Queue(self, maxsize):
+        return queue.Queue(maxsize)
+
+    def arreglo(self, tipo, n):
+        return [0.0 if tipo == "d" else 0] * n
+
+    def trabajador(self, target, args):
+        return threading.Thread(target=target, args=args)
+
+
+class BackendProcesos:
+    def __init__(self):
+        metodo = "fork" if "fork" in multiprocessing.get_all_start_methods() else "spawn"
+        self.ctx = multiprocessing.get_context(metodo)
+        self.nombre = "procesos"
+        self.Lock = self.ctx.Lock
+        self.Semaphore = self.ctx.Semaphore
+        self.Condition = self.ctx.Condition
+        self.Barrier = self.ctx.Barrier
+
+    def Queue(self, maxsize):
+        return self.ctx.Queue(maxsize)
+
+    def arreglo(self, tipo, n):
+        return self.ctx.Array(tipo, n, lock=False)  # protegido por los locks del escenario
+
+    def trabajador(self, target, args):
+        return self.ctx.Process(target=target, args=args)
+
+
+# -----------------------
+# Escenario 1: productor-consumidor
+# -----------------------
+class MonitorAnillo:
+    """
+    Mismo monitor que MonitorProductorConsumidor (un Lock y dos Conditions),
+    pero sobre un buffer circular en memoria compartida para poder usarlo
+    también entre procesos.
+    """
+    def __init__(self, backend, tamano_maximo):
+        self.buffer = backend.arreglo("q", tamano_maximo)
+        self.estado = backend.arreglo("q", 2)  # [cabeza, cuenta]
+        self.tamano_maximo = tamano_maximo
+        self.lock = backend.Lock()
+        self.cond_no_lleno = backend.Condition(self.lock)
+        self.cond_no_vacio = backend.Condition(self.lock)
+
+    def producir(self, item, trabajo_dentro):
+        """
+        Devuelve el tiempo de espera para entrar al monitor: el lock más
+        cond_no_lleno.wait() y la readquisición del lock, hasta tener lugar.
+        """
+        t0 = time.perf_counter()
+        self.lock.acquire()
+        try:
+            while self.estado[1] == self.tamano_maximo:
+                self.cond_no_lleno.wait()
+            espera = time.perf_counter() - t0
+            cola = (self.estado[0] + self.estado[1]) % self.tamano_maximo
+            self.buffer[cola] = item
+            self.estado[1] += 1
+            trabajo_cpu(trabajo_dentro)
+            self.cond_no_vacio.notify()
+        finally:
+            self.lock.release()
+        return espera
+
+    def consumir(self, trabajo_dentro):
+        t0 = time.perf_counter()
+        self.lock.acquire()
+        try:
+            while self.estado[1] == 0:
+                self.cond_no_vacio.wait()
+            espera = time.perf_counter() - t0
+            self.buffer[self.estado[0]]  # saca el item
+            self.estado[0] = (self.estado[0] + 1) % self.tamano_maximo
+            self.estado[1] -= 1
+            trabajo_cpu(trabajo_dentro)
+            self.cond_no_lleno.notify()
+        finally:
+            self.lock.release()
+        return espera
+
+
+def _productor(monitor, barrera, items, cfg, estad, estad_lock):
+    trabajo_fuera, trabajo_dentro = cfg
+    barrera.wait()
+    espera = 0.0
+    for i in range(items):
+        trabajo_cpu(trabajo_fuera)  # "fabricar" el item
+        espera += monitor.producir(i, trabajo_dentro)
+    with estad_lock:
+        estad[0] += espera
+
+
+def _consumidor(monitor, barrera, items, cfg, estad, estad_lock):
+    trabajo_fuera, trabajo_dentro = cfg
+    barrera.wait()
+    espera = 0.0
+    for _ in range(items):
+        espera += monitor.consumir(trabajo_dentro)
+        trabajo_cpu(trabajo_fuera)  # "usar" el item
+    with estad_lock:
+        estad[0] += espera
+
+
+def escenario_productor_consumidor(backend, n, args):
+    """n productores y n consumidores; cada lado hace la mitad del trabajo fuera."""
+    monitor = MonitorAnillo(backend, TAMANO_BUFFER)
+    barrera = backend.Barrier(2 * n + 1)
+    estad = backend.arreglo("d", 1)
+    estad_lock = backend.Lock()
+    cfg = (args.trabajo_fuera // 2, args.trabajo_dentro // 2)
+    trabajadores = []
+    for items in reparto(args.items, n):
+        trabajadores.append(backend.trabajador(_productor, (monitor, barrera, items, cfg, estad, estad_lock)))
+        trabajadores.append(backend.trabajador(_consumidor, (monitor, barrera, items, cfg, estad, estad_lock)))
+    return _correr(trabajadores, barrera, estad, estad_lock)
+
+
+# -----------------------
+# Escenario 2: barbero dormilón
+# -----------------------
+def _barbero(sala_espera, barrera, metrics_lock, metricas, cfg, estad, estad_lock):
+    trabajo_fuera, trabajo_dentro = cfg
+    barrera.wait()
+    espera_lock = 0.0
+    while True:
+        t_llegada = sala_espera.get()
+        if t_llegada is None:  # centinela: cerró la barbería
+            break
+        wait = time.perf_counter() - t_llegada
+        trabajo_cpu(trabajo_fuera)  # el corte de cabello
+
+        t0 = time.perf_counter()
+        metrics_lock.acquire()
+        espera_lock += time.perf_counter() - t0
+        try:
+            # mismas métricas que barberoDormilon.py (Welford + atendidos)
+            metricas[0] += 1
+            delta = wait - metricas[1]
+            metricas[1] += delta / metricas[0]
+            metricas[2] += delta * (wait - metricas[1])
+            trabajo_cpu(trabajo_dentro)
+        finally:
+            metrics_lock.release()
+    with estad_lock:
+        estad[0] += espera_lock
+
+
+def escenario_barbero(backend, n, args):
+    """n barberos; el hilo principal hace llegar a los clientes a sala_espera."""
+    sala_espera = backend.Queue(ASIENTOS)
+    barrera = backend.Barrier(n + 1)
+    metrics_lock = backend.Lock()
+    metricas = backend.arreglo("d", 3)  # [fair_n, fair_mean, fair_M2]
+    estad = backend.arreglo("d", 1)
+    estad_lock = backend.Lock()
+    cfg = (args.trabajo_fuera, args.trabajo_dentro)
+    trabajadores = [
+        backend.trabajador(_barbero, (sala_espera, barrera, metrics_lock, metricas, cfg, estad, estad_lock))
+        for _ in range(n)
+    ]
+
+    def llegadas():
+        for _ in range(args.items):
+            sala_espera.put(time.perf_counter())
+        for _ in range(n):
+            sala_espera.put(None)
+
+    return _correr(trabajadores, barrera, estad, estad_lock, llegadas)
+
+
+# -----------------------
+# Escenario 3: lectores-escritores
+# -----------------------
+def _lector_escritor(sems, lectores_activos, libros, barrera, operaciones, cfg, estad, estad_lock):
+    sem_escritura, sem_turno, mutex = sems
+    trabajo_fuera, trabajo_dentro = cfg
+    barrera.wait()
+    espera = 0.0
+    for op in range(operaciones):
+        trabajo_cpu(trabajo_fuera)
+        if op % ESCRITURA_CADA == 0:
+            # escritor: cola FIFO y acceso exclusivo
+            # (la espera cuenta desde la cola en sem_turno hasta tener sem_escritura)
+            t0 = time.perf_counter()
+            sem_turno.acquire()
+            sem_escritura.acquire()
+            espera += time.perf_counter() - t0
+            sem_turno.release()
+            libros[0] += 3
+            trabajo_cpu(trabajo_dentro)
+            sem_escritura.release()
+        else:
+            # lector: el primero bloquea a los escritores
+            # (la espera incluye sem_turno y mutex, que se traban detrás de sem_escritura)
+            t0 = time.perf_counter()
+            sem_turno.acquire()
+            with mutex:
+                lectores_activos[0] += 1
+                if lectores_activos[0] == 1:
+                    sem_escritura.acquire()
+            espera += time.perf_counter() - t0
+            sem_turno.release()
+            trabajo_cpu(trabajo_dentro)  # lectura compartida
+            with mutex:
+                lectores_activos[0] -= 1
+                if lectores_activos[0] == 0:
+                    sem_escritura.release()
+    with estad_lock:
+        estad[0] += espera
+
+
+def escenario_lectores_escritores(backend, n, args):
+    """n trabajadores que mezclan lecturas y escrituras (1 de cada ESCRITURA_CADA)."""
+    sems = (backend.Semaphore(1), backend.Semaphore(1), backend.Lock())
+    lectores_activos = backend.arreglo("i", 1)
+    libros = backend.arreglo("i", 1)
+    barrera = backend.Barrier(n + 1)
+    estad = backend.arreglo("d", 1)
+    estad_lock = backend.Lock()
+    cfg = (args.trabajo_fuera, args.trabajo_dentro)
+    trabajadores = [
+        backend.trabajador(_lector_escritor, (sems, lectores_activos, libros, barrera, ops, cfg, estad, estad_lock))
+        for ops in reparto(args.items, n)
+    ]
+    return _correr(trabajadores, barrera, estad, estad_lock)
+
+
+ESCENARIO_FN = {
+    "productor-consumidor": escenario_productor_consumidor,
+    "barbero": escenario_barbero,
+    "lectores-escritores": escenario_lectores_escritores,
+}
+
+
+def _correr(trabajadores, barrera, estad, estad_lock, principal=None):
+    """Arranca, sincroniza con la barrera y mide hasta el último join."""
+    for t in trabajadores:
+        t.start()
+    barrera.wait()  # no se cuenta el costo de crear hilos/procesos
+    t_inicio = time.perf_counter()
+    if principal is not None:
+        principal()
+    for t in trabajadores:
+        t.join()
+    duracion = time.perf_counter() - t_inicio
+    with estad_lock:
+        espera = estad[0]
+    ocupacion = duracion * len(trabajadores)
+    return duracion, (espera / ocupacion * 100) if ocupacion > 0 else 0.0
+
+
+# -----------------------
+# Series de núcleos y reporte
+# -----------------------
+def serie_nucleos(maximo):
+    serie = []
+    n = 1
+    while n < maximo:
+        serie.append(n)
+        n *= 2
+    serie.append(maximo)
+    return serie
+
+
+def medir(backend, args):
+    resultados = {}
+    for escenario in args.escenarios:
+        puntos = []
+        for n in serie_nucleos(args.max_nucleos):
+            mejores = min(
+                (ESCENARIO_FN[escenario](backend, n, args) for _ in range(args.repeticiones)),
+                key=lambda r: r[0],
+            )
+            puntos.append({"n": n, "tiempo": mejores[0], "espera_pct": mejores[1]})
+        base = puntos[0]["tiempo"]
+        for p in puntos:
+            p["speedup"] = base / p["tiempo"] if p["tiempo"] > 0 else 0.0
+            p["eficiencia"] = p["speedup"] / p["n"]
+        resultados[escenario] = puntos
+    return resultados
+
+
+def medir_sin_gil(args):
+    """Corre el backend de hilos en un intérprete free-threaded, si hay uno."""
+    exe = os.environ.get("PYTHON_FREETHREADED")
+    if not exe:
+        exe = next((shutil.which(nombre) for nombre in INTERPRETES_SIN_GIL if shutil.which(nombre)), None)
+    if not exe:
+        return None
+    cmd = [
+        exe, os.path.abspath(__file__), "--json", "--backends", "hilos",
+        "--max-nucleos", str(args.max_nucleos), "--items", str(args.items),
+        "--trabajo-fuera", str(args.trabajo_fuera), "--trabajo-dentro", str(args.trabajo_dentro),
+        "--repeticiones", str(args.repeticiones), "--escenarios", *args.escenarios,
+    ]
+    # PYTHON_GIL=0 evita que una extensión vuelva a activar el GIL
+    salida = subprocess.run(cmd, capture_output=True, text=True, env={**os.environ, "PYTHON_GIL": "0"})
+    if salida.returncode != 0:
+        print(f"⚠️  Falló {exe}: {salida.stderr.strip()}", file=sys.stderr)
+        return None
+    return json.loads(salida.stdout)
+
+
+def imprimir(resultados):
+    for escenario in next(iter(resultados.values())).keys():
+        print(f"\n=== {escenario} (serializa en {PRIMITIVA[escenario]}) ===")
+        for nombre, por_escenario in resultados.items():
+            print(f"\n  [{nombre}]")
+            print(f"  {'n':>4} {'tiempo (s)':>11} {'speedup':>8} {'eficiencia':>11} {'espera prim.':>13}")
+            for p in por_escenario[escenario]:
+                barra = "█" * max(1, round(p["speedup"] * 4))
+                print(f"  {p['n']:>4} {p['tiempo']:>11.3f} {p['speedup']:>8.2f} "
+                      f"{p['eficiencia'] * 100:>10.1f}% {p['espera_pct']:>12.1f}%  {barra}")
+
+    print("\nNotas:")
+    print("- speedup: T(1) / T(n) con el mismo trabajo total repartido entre n trabajadores.")
+    print("- eficiencia: speedup / n (100% = escalamiento lineal).")
+    print("- espera prim.: % del tiempo de los trabajadores bloqueados entrando a la primitiva (incluye colas y Conditions)")
+    print("  que serializa el escenario; si sube con n, ahí se pierde el paralelismo.")
+    print("- productor-consumidor usa n productores + n consumidores (2n trabajadores).")
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Escalamiento multinúcleo con trabajo CPU-bound.")
+    parser.add_argument("--max-nucleos", type=int, default=os.cpu_count() or 1)
+    parser.add_argument("--items", type=int, default=ITEMS)
+    parser.add_argument("--trabajo-fuera", type=int, default=TRABAJO_FUERA)
+    parser.add_argument("--trabajo-dentro", type=int, default=TRABAJO_DENTRO)
+    parser.add_argument("--repeticiones", type=int, default=1, help="se queda con la mejor corrida")
+    parser.add_argument("--escenarios", nargs="+", choices=ESCENARIOS, default=list(ESCENARIOS))
+    parser.add_argument("--backends", nargs="+", choices=("hilos", "sin-gil", "procesos"),
+                        default=["hilos", "sin-gil", "procesos"])
+    parser.add_argument("--json", action="store_true", help="imprime los resultados como JSON")
+    args = parser.parse_args()
+    if args.max_nucleos < 1:
+        parser.error("--max-nucleos debe ser al menos 1")
+
+    resultados = {}
+    if "hilos" in args.backends:
+        backend = BackendHilos()
+        resultados[backend.nombre] = medir(backend, args)
+    if "sin-gil" in args.backends and gil_activo():
+        sin_gil = medir_sin_gil(args)
+        if sin_gil is None:
+            if not args.json:
+                print("ℹ️  No se encontró un intérprete free-threaded (python3.13t/3.14t o PYTHON_FREETHREADED).")
+        else:
+            resultados.update(sin_gil)
+    if "procesos" in args.backends:
+        resultados["procesos"] = medir(BackendProcesos(), args)
+
+    if args.json:
+        print(json.dumps(resultados, indent=2))
+    elif resultados:
+        imprimir(resultados)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,589 @@
+#!/usr/bin/env python3
+"""
+Microbenchmarks de las primitivas de sincronización que usan las simulaciones.
+
+Primitivas medidas:
+  - lock: threading.Lock
+  - semaforo: threading.Semaphore
+  - condition: Condition.wait / notify (ops_seg: anillo de turnos entre los hilos)
+  - queue: queue.Queue get/put (barbero)
+  - monitor: deque + dos Conditions (MonitorProductorConsumidor; ops_seg: productores y consumidores sobre un buffer de un lugar)
+  - rw: protocolo lectores-escritores con sem_turno, mutex y sem_escritura
+
+Métricas por primitiva:
+  - ops_seg: operaciones/s con 1 hilo (sin contención) y con varios hilos (contención).
+  - handoff_us: latencia de pasar el turno a otro hilo (ping-pong, ida y vuelta / 2).
+  - wakeup_us: latencia desde que se despierta a un hilo dormido hasta que corre.
+
+El baseline guarda la mediana de cada métrica y el valor de cada repetición.
+Las repeticiones se intercalan entre primitivas para que el ruido capture la
+deriva de toda la corrida. 'comparar' sólo marca una regresión si el cambio supera
+el umbral y también el rango (máx - mín) de las repeticiones del baseline y del nuevo.
+
+Uso:
+  python3 microbench_primitivas.py medir --guardar baselines/mi_maquina.json
+  python3 microbench_primitivas.py comparar baselines/mi_maquina.json nuevo.json --umbral 10
+"""
+
+import argparse
+import datetime
+import json
+import math
+import os
+import platform
+import queue
+import statistics
+import sys
+import threading
+import time
+from collections import deque
+
+HILOS = (1, 2, 4, 8)      # cantidades de hilos para ops_seg
+DURACION = 0.2            # segundos por medición de ops_seg
+MUESTRAS_LATENCIA = 2000  # idas y vueltas para handoff
+MUESTRAS_WAKEUP = 1000    # despertares medidos (con pocas muestras el p99 es casi sólo jitter del scheduler)
+REPETICIONES = 5          # se reporta la mediana; los valores crudos dan la medida de ruido
+UMBRAL = 10.0             # % de empeoramiento que se considera regresión
+LOTE = 100                # operaciones entre cada consulta del reloj
+
+
+# -----------------------
+# Monitor y protocolo RW (mismo diseño que las simulaciones)
+# -----------------------
+class Monitor:
+    """deque + Lock + cond_no_lleno/cond_no_vacio, como MonitorProductorConsumidor."""
+    def __init__(self, tamano_maximo):
+        self.buffer = deque()
+        self.tamano_maximo = tamano_maximo
+        self.lock = threading.Lock()
+        self.cond_no_lleno = threading.Condition(self.lock)
+        self.cond_no_vacio = threading.Condition(self.lock)
+        self.cerrado = False  # sólo para el benchmark: libera a los que esperan cuando se acaba un rol
+
+    def producir(self, item):
+        with self.lock:
+            while len(self.buffer) == self.tamano_maximo and not self.cerrado:
+                self.cond_no_lleno.wait()
+            if self.cerrado:
+                return
+            self.buffer.append(item)
+            self.cond_no_vacio.notify()
+
+    def consumir(self):
+        with self.lock:
+            while len(self.buffer) == 0 and not self.cerrado:
+                self.cond_no_vacio.wait()
+            if len(self.buffer) == 0:
+                return None
+            item = self.buffer.popleft()
+            self.cond_no_lleno.notify()
+            return item
+
+
+class ProtocoloRW:
+    """Lectores-escritores FIFO como en readers-writers.py."""
+    def __init__(self):
+        self.sem_escritura = threading.Semaphore(1)
+        self.sem_turno = threading.Semaphore(1)
+        self.mutex = threading.Lock()
+        self.lectores_activos = 0
+
+    def entrar_lector(self):
+        self.sem_turno.acquire()
+        with self.mutex:
+            self.lectores_activos += 1
+            if self.lectores_activos == 1:
+                self.sem_escritura.acquire()
+        self.sem_turno.release()
+
+    def salir_lector(self, liberar=True):
+        with self.mutex:
+            self.lectores_activos -= 1
+            if self.lectores_activos == 0 and liberar:
+                self.sem_escritura.release()
+
+    def entrar_escritor(self):
+        self.sem_turno.acquire()
+        self.sem_escritura.acquire()
+        self.sem_turno.release()
+
+    def salir_escritor(self):
+        self.sem_escritura.release()
+
+
+# -----------------------
+# Operación (para ops_seg) y canal de un lugar (para handoff/wakeup)
+# -----------------------
+def operacion_lock(n):
+    lock = threading.Lock()
+    def op(i):
+        with lock:
+            pass
+    return op
+
+
+def operacion_semaforo(n):
+    sem = threading.Semaphore(1)
+    def op(i):
+        sem.acquire()
+        sem.release()
+    return op
+
+
+class AnilloCondition:
+    """
+    Cada hilo espera (Condition.wait) su turno, lo pasa al siguiente y hace
+    notify_all. El hilo que termina su medición sale del anillo para no dejar
+    a los demás esperando un turno que no llega.
+    """
+    def __init__(self, n):
+        self.cond = threading.Condition()
+        self.activos = list(range(n))
+        self.turno = 0
+
+    def _siguiente(self, i):
+        restantes = [a for a in self.activos if a > i] or self.activos
+        return restantes[0] if restantes else None
+
+    def __call__(self, i):
+        with self.cond:
+            while self.turno != i:
+                self.cond.wait()
+            self.turno = self._siguiente(i)
+            self.cond.notify_all()
+
+    def terminar(self, i):
+        with self.cond:
+            self.activos.remove(i)
+            if self.turno == i:
+                self.turno = self._siguiente(i)
+            self.cond.notify_all()
+
+
+def operacion_condition(n):
+    return AnilloCondition(n)
+
+
+def operacion_queue(n):
+    q = queue.Queue()
+    def op(i):
+        q.put(None)
+        q.get()
+    return op
+
+
+class OperacionMonitor:
+    """
+    Hilos pares producen e impares consumen sobre un buffer de un lugar, así que
+    cond_no_lleno.wait() y cond_no_vacio.wait() ocurren de verdad. Con 1 hilo
+    produce y consume (sin contención). Cuando ya no quedan hilos de un rol se
+    cierra el monitor para que los del otro rol no se queden esperando.
+    """
+    def __init__(self, n):
+        self.monitor = Monitor(1)
+        self.n = n
+        self.restantes = [(n + 1) // 2, n // 2]  # [productores, consumidores]
+
+    def __call__(self, i):
+        if self.n == 1:
+            self.monitor.producir(None)
+            self.monitor.consumir()
+        elif i % 2 == 0:
+            self.monitor.producir(None)
+        else:
+            self.monitor.consumir()
+
+    def terminar(self, i):
+        if self.n == 1:
+            return
+        with self.monitor.lock:
+            self.restantes[i % 2] -= 1
+            if self.restantes[i % 2] == 0:
+                self.monitor.cerrado = True
+                self.monitor.cond_no_lleno.notify_all()
+                self.monitor.cond_no_vacio.notify_all()
+
+
+def operacion_monitor(n):
+    return OperacionMonitor(n)
+
+
+def operacion_rw(n):
+    rw = ProtocoloRW()
+    contador = [0]
+    def op(i):
+        contador[0] += 1  # aproximado entre hilos; sólo decide la mezcla 1 de cada 10
+        if contador[0] % 10 == 0:
+            rw.entrar_escritor()
+            rw.salir_escritor()
+        else:
+            rw.entrar_lector()
+            rw.salir_lector()
+    return op
+
+
+class CanalLock:
+    def __init__(self):
+        self.lock = threading.Lock()
+        self.lock.acquire()  # empieza tomado; enviar lo libera desde otro hilo
+        self.valor = None
+
+    def enviar(self, valor):
+        self.valor = valor
+        self.lock.release()
+
+    def recibir(self):
+        self.lock.acquire()
+        return self.valor
+
+
+class CanalSemaforo(CanalLock):
+    def __init__(self):
+        self.lock = threading.Semaphore(0)
+        self.valor = None
+
+
+class CanalCondition:
+    def __init__(self):
+        self.cond = threading.Condition()
+        self.listo = False
+        self.valor = None
+
+    def enviar(self, valor):
+        with self.cond:
+            self.valor = valor
+            self.listo = True
+            self.cond.notify()
+
+    def recibir(self):
+        with self.cond:
+            while not self.listo:
+                self.cond.wait()
+            self.listo = False
+            return self.valor
+
+
+class CanalQueue:
+    def __init__(self):
+        self.q = queue.Queue(1)
+
+    def enviar(self, valor):
+        self.q.put(valor)
+
+    def recibir(self):
+        return self.q.get()
+
+
+class CanalMonitor:
+    def __init__(self):
+        self.monitor = Monitor(1)
+
+    def enviar(self, valor):
+        self.monitor.producir(valor)
+
+    def recibir(self):
+        return self.monitor.consumir()
+
+
+class CanalRW:
+    """
+    El emisor es un escritor que suelta sem_escritura; el receptor entra como
+    lector (primer lector) y al salir se queda con sem_escritura para la próxima vuelta.
+    """
+    def __init__(self):
+        self.rw = ProtocoloRW()
+        self.rw.sem_escritura.acquire()
+        self.valor = None
+
+    def enviar(self, valor):
+        self.valor = valor
+        self.rw.salir_escritor()
+
+    def recibir(self):
+        self.rw.entrar_lector()
+        valor = self.valor
+        self.rw.salir_lector(liberar=False)
+        return valor
+
+
+PRIMITIVAS = {
+    "lock": (operacion_lock, CanalLock),
+    "semaforo": (operacion_semaforo, CanalSemaforo),
+    "condition": (operacion_condition, CanalCondition),
+    "queue": (operacion_queue, CanalQueue),
+    "monitor": (operacion_monitor, CanalMonitor),
+    "rw": (operacion_rw, CanalRW),
+}
+
+
+# -----------------------
+# Mediciones
+# -----------------------
+def medir_ops(fabrica, n, duracion):
+    op = fabrica(n)
+    terminar = getattr(op, "terminar", None)
+    barrera = threading.Barrier(n + 1)
+    conteos = [0] * n
+
+    def trabajador(i):
+        barrera.wait()
+        fin = time.perf_counter() + duracion
+        hechas = 0
+        while time.perf_counter() < fin:
+            for _ in range(LOTE):
+                op(i)
+            hechas += LOTE
+        conteos[i] = hechas
+        if terminar is not None:
+            terminar(i)
+
+    hilos = [threading.Thread(target=trabajador, args=(i,)) for i in range(n)]
+    for h in hilos:
+        h.start()
+    barrera.wait()
+    t0 = time.perf_counter()
+    for h in hilos:
+        h.join()
+    return sum(conteos) / (time.perf_counter() - t0)
+
+
+def medir_handoff(canal, muestras):
+    ida, vuelta = canal(), canal()
+
+    def eco():
+        for _ in range(muestras):
+            vuelta.enviar(ida.recibir())
+
+    h = threading.Thread(target=eco)
+    h.start()
+    t0 = time.perf_counter()
+    for i in range(muestras):
+        ida.enviar(i)
+        vuelta.recibir()
+    total = time.perf_counter() - t0
+    h.join()
+    return total / muestras / 2 * 1e6
+
+
+def medir_wakeup(canal, muestras):
+    c = canal()
+    listo = threading.Semaphore(0)  # el receptor avisa que registró la muestra anterior y va a bloquearse
+    latencias = []
+
+    def dormilon():
+        for _ in range(muestras):
+            listo.release()
+            enviado = c.recibir()
+            latencias.append(time.perf_counter() - enviado)
+
+    h = threading.Thread(target=dormilon)
+    h.start()
+    for _ in range(muestras):
+        listo.acquire()  # nunca hay más de un envío pendiente
+        time.sleep(0.0005)  # sólo para que el receptor alcance a dormirse; no afecta la corrección
+        c.enviar(time.perf_counter())
+    h.join()
+    latencias.sort()
+    return {
+        "p50": latencias[len(latencias) // 2] * 1e6,
+        "p99": latencias[max(0, math.ceil(0.99 * len(latencias)) - 1)] * 1e6,
+    }
+
+
+def agrupar(valores):
+    """Lista de valores por repetición -> lista (o dict de listas, como en wakeup)."""
+    if isinstance(valores[0], dict):
+        return {k: [v[k] for v in valores] for k in valores[0]}
+    return valores
+
+
+def mediana(valores):
+    if isinstance(valores, dict):
+        return {k: statistics.median(v) for k, v in valores.items()}
+    return statistics.median(valores)
+
+
+def medir(args):
+    # una ronda mide todas las primitivas; así cada repetición cae en un momento distinto de la corrida
+    rondas = {nombre: {"ops_seg": {str(n): [] for n in args.hilos}, "handoff_us": [], "wakeup_us": []}
+              for nombre in args.primitivas}
+    for ronda in range(args.repeticiones):
+        print(f"Ronda {ronda + 1}/{args.repeticiones}...", file=sys.stderr)
+        for nombre in args.primitivas:
+            operacion, canal = PRIMITIVAS[nombre]
+            for n in args.hilos:
+                rondas[nombre]["ops_seg"][str(n)].append(medir_ops(operacion, n, args.duracion))
+            rondas[nombre]["handoff_us"].append(medir_handoff(canal, args.muestras))
+            rondas[nombre]["wakeup_us"].append(medir_wakeup(canal, args.muestras_wakeup))
+    crudos = {
+        nombre: {
+            "ops_seg": m["ops_seg"],
+            "handoff_us": m["handoff_us"],
+            "wakeup_us": agrupar(m["wakeup_us"]),
+        }
+        for nombre, m in rondas.items()
+    }
+    resultados = {
+        nombre: {metrica: mediana(valores) for metrica, valores in metricas.items()}
+        for nombre, metricas in crudos.items()
+    }
+    return {
+        "meta": {
+            "fecha": datetime.datetime.now().isoformat(timespec="seconds"),
+            "python": platform.python_version(),
+            "implementacion": platform.python_implementation(),
+            "gil": getattr(sys, "_is_gil_enabled", lambda: True)(),
+            "plataforma": platform.platform(),
+            "cpus": os.cpu_count(),
+            "config": config_de(args),
+        },
+        "resultados": resultados,
+        "repeticiones": crudos,
+    }
+
+
+# -----------------------
+# Comparación contra baseline
+# -----------------------
+CONFIG_COBERTURA = ("primitivas", "hilos")  # si difieren sólo se comparan las métricas comunes
+CONFIG_MEDICION = ("duracion", "muestras", "muestras_wakeup", "repeticiones")  # si difieren, no es comparable
+
+
+def config_de(args):
+    return {clave: getattr(args, clave) for clave in CONFIG_COBERTURA + CONFIG_MEDICION}
+
+
+def revisar_configs(base, nuevo):
+    """Avisa de diferencias de cobertura; devuelve las diferencias de medición."""
+    config_base = base["meta"].get("config", {})
+    config_nuevo = nuevo["meta"].get("config", {})
+    if not config_base or not config_nuevo:
+        print("⚠️  Uno de los resultados no guarda su configuración; no se puede verificar que sean comparables.")
+        return []
+    for clave in CONFIG_COBERTURA:
+        if config_base.get(clave) != config_nuevo.get(clave):
+            print(f"⚠️  {clave} distinto (base={config_base.get(clave)}, nuevo={config_nuevo.get(clave)}); "
+                  "sólo se comparan las métricas comunes.")
+    return [
+        (clave, config_base.get(clave), config_nuevo.get(clave))
+        for clave in CONFIG_MEDICION
+        if config_base.get(clave) != config_nuevo.get(clave)
+    ]
+
+
+def aplanar(resultados):
+    """{'lock': {'ops_seg': {'1': x}}} -> {'lock.ops_seg.1': x} (x puede ser la lista de repeticiones)"""
+    plano = {}
+    for nombre, metricas in resultados.items():
+        for metrica, valor in metricas.items():
+            if isinstance(valor, dict):
+                for sub, v in valor.items():
+                    plano[f"{nombre}.{metrica}.{sub}"] = v
+            else:
+                plano[f"{nombre}.{metrica}"] = valor
+    return plano
+
+
+def rango(valores):
+    """Ruido de una métrica: máx - mín entre repeticiones (0 si no hay repeticiones guardadas)."""
+    return max(valores) - min(valores) if valores else 0.0
+
+
+def comparar(base, nuevo, umbral):
+    """
+    Devuelve la lista de regresiones (clave, base, nuevo, cambio %). Una métrica es
+    regresión si empeora más que el umbral y más que el ruido de base y de nuevo.
+    """
+    plano_base = aplanar(base["resultados"])
+    plano_nuevo = aplanar(nuevo["resultados"])
+    reps_base = aplanar(base.get("repeticiones", {}))
+    reps_nuevo = aplanar(nuevo.get("repeticiones", {}))
+    regresiones = []
+    print(f"{'métrica':<28} {'base':>14} {'nuevo':>14} {'cambio':>9} {'ruido':>8}")
+    for clave in sorted(plano_base.keys() & plano_nuevo.keys()):
+        b, n = plano_base[clave], plano_nuevo[clave]
+        if b == 0:
+            continue
+        # ops_seg: más es mejor; latencias (_us): menos es mejor
+        mas_es_mejor = ".ops_seg." in clave
+        empeora = (b - n) / b * 100 if mas_es_mejor else (n - b) / b * 100
+        ruido = max(rango(reps_base.get(clave)), rango(reps_nuevo.get(clave)))
+        marca = ""
+        if empeora > umbral and abs(n - b) > ruido:
+            marca = "  ⚠️  REGRESIÓN"
+            regresiones.append((clave, b, n, empeora))
+        print(f"{clave:<28} {b:>14.2f} {n:>14.2f} {-empeora:>+8.1f}% {ruido / b * 100:>7.1f}%{marca}")
+    faltantes = plano_base.keys() - plano_nuevo.keys()
+    if faltantes:
+        print(f"\nMétricas sin medir en el nuevo resultado: {', '.join(sorted(faltantes))}")
+    return regresiones
+
+
+def imprimir(datos):
+    for nombre, m in datos["resultados"].items():
+        ops = "  ".join(f"{n}h={v:,.0f}" for n, v in m["ops_seg"].items())
+        print(f"\n[{nombre}]")
+        print(f"  ops/s: {ops}")
+        print(f"  handoff: {m['handoff_us']:.2f} µs")
+        print(f"  wakeup: p50={m['wakeup_us']['p50']:.2f} µs  p99={m['wakeup_us']['p99']:.2f} µs")
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Microbenchmarks de primitivas de sincronización.")
+    sub = parser.add_subparsers(dest="comando", required=True)
+
+    p_medir = sub.add_parser("medir", help="mide las primitivas")
+    p_medir.add_argument("--primitivas", nargs="+", choices=list(PRIMITIVAS), default=list(PRIMITIVAS))
+    p_medir.add_argument("--hilos", nargs="+", type=int, default=list(HILOS))
+    p_medir.add_argument("--duracion", type=float, default=DURACION)
+    p_medir.add_argument("--muestras", type=int, default=MUESTRAS_LATENCIA)
+    p_medir.add_argument("--muestras-wakeup", type=int, default=MUESTRAS_WAKEUP)
+    p_medir.add_argument("--repeticiones", type=int, default=REPETICIONES)
+    p_medir.add_argument("--guardar", metavar="RUTA", help="guarda el resultado como baseline JSON")
+
+    p_comparar = sub.add_parser("comparar", help="compara un resultado contra un baseline")
+    p_comparar.add_argument("base")
+    p_comparar.add_argument("nuevo", nargs="?", help="si se omite, se mide ahora con la configuración del baseline")
+    p_comparar.add_argument("--umbral", type=float, default=UMBRAL, help="%% de ruido tolerado")
+    p_comparar.add_argument("--forzar", action="store_true",
+                            help="compara aunque la duración, las muestras o las repeticiones sean distintas")
+
+    args = parser.parse_args()
+
+    if args.comando == "medir":
+        datos = medir(args)
+        imprimir(datos)
+        if args.guardar:
+            os.makedirs(os.path.dirname(os.path.abspath(args.guardar)), exist_ok=True)
+            with open(args.guardar, "w", encoding="utf-8") as f:
+                json.dump(datos, f, indent=2)
+            print(f"\nBaseline guardado en {args.guardar}")
+        return
+
+    with open(args.base, encoding="utf-8") as f:
+        base = json.load(f)
+    if args.nuevo:
+        with open(args.nuevo, encoding="utf-8") as f:
+            nuevo = json.load(f)
+    else:
+        # se mide con la misma configuración del baseline (o los valores por defecto si no la guarda)
+        args_medir = parser.parse_args(["medir"])
+        for clave, valor in base["meta"].get("config", {}).items():
+            setattr(args_medir, clave, valor)
+        nuevo = medir(args_medir)
+    diferencias = revisar_configs(base, nuevo)
+    if diferencias:
+        for clave, b, n in diferencias:
+            print(f"❌ {clave} distinto: base={b}, nuevo={n}")
+        if not args.forzar:
+            print("Los resultados no son comparables (usa --forzar para compararlos igual).")
+            sys.exit(2)
+    regresiones = comparar(base, nuevo, args.umbral)
+    if regresiones:
+        print(f"\n{len(regresiones)} regresión(es) por encima del umbral de {args.umbral:.1f}%")
+        sys.exit(1)
+    print(f"\nSin regresiones por encima del umbral de {args.umbral:.1f}%")
+
+
+if __name__ == "__main__":
+    main()